@@ -23,7 +23,8 @@ def parse_image_reference_to_parts(image):
     # digest = sha256:627867e53ad6846afba2dfbf5cef1d54c868a9025633ef0afd546278d4654eac
     # repository = registry.access.redhat.com/ubi8/ubi
     # name = ubi
-    repository_with_tag, digest = image.split("@")
+    # the digest is always the last part of the reference, split on the last "@" only
+    repository_with_tag, digest = image.rsplit("@", 1)
     # splitting from the right side once on colon to get rid of the tag,
     # as the repository part might contain registry url containing a port (host:port)
     repository, _ = repository_with_tag.rsplit(":", 1)
@@ -42,8 +43,9 @@ def get_base_images_sbom_components(base_images_digests, is_last_from_scratch):
     :return: components (List) - List of dict items in which each item contains sbom data about each base image
     """
 
-    components = []
-    already_used_base_images = set()
+    # components are indexed by purl, so a base image used in multiple stages
+    # is looked up directly instead of scanning all the components collected so far
+    components_by_purl = {}
 
     # property_name shows whether the image was used only in the building process
     # or if it is the final base image. If the final base image is scratch, then
@@ -69,22 +71,18 @@ def get_base_images_sbom_components(base_images_digests, is_last_from_scratch):
 
         # If the base image is used in multiple stages then instead of adding another component
         # only additional property is added to the existing component
-        if purl_str in already_used_base_images:
+        if purl_str in components_by_purl:
             property = {"name": property_name, "value": property_value}
-            for component in components:
-                if component["purl"] == purl_str:
-                    component["properties"].append(property)
+            components_by_purl[purl_str]["properties"].append(property)
         else:
-            component = {
+            components_by_purl[purl_str] = {
                 "type": "container",
                 "name": parsed_image.repository,
                 "purl": purl_str,
                 "properties": [{"name": property_name, "value": property_value}],
             }
-            components.append(component)
-            already_used_base_images.add(purl_str)
 
-    return components
+    return list(components_by_purl.values())
 
 
 def parse_args():
@@ -20,7 +20,6 @@ from pathlib import Path
 from subprocess import run
 from tarfile import TarInfo
 from typing import Any, TypedDict, NotRequired, Literal, Final
-from urllib.parse import urlparse
 
 
 """
@@ -45,6 +44,10 @@ ARCHIVE_MIMETYPES = (
 
 MAX_RETRIES: Final = 5
 
+# Patterns matching the members of a layer generated by BuildSourceImage
+BSI_EXTRA_SRC_REGEX: Final = re.compile(r"^extra-src-[0-9a-f]+\.tar$")
+BSI_BLOB_FILE_REGEX: Final = re.compile(r"\./blobs/sha256/[0-9a-f]+")
+
 StrPath = str | os.PathLike
 
 
@@ -242,29 +245,33 @@ def gather_prefetched_sources(
         log.info("Cannot find cachi2 output directory at %s", cachi2_output_dir)
         return gathered
 
-    def _find_prefetch_source_archives():
-        guess_mime = filetype.guess_mime
-        for root, _, files in os.walk(cachi2_output_dir):
-            for filename in files:
-                mimetype = guess_mime(os.path.join(root, filename))
-                if mimetype and mimetype in ARCHIVE_MIMETYPES:
-                    yield root, filename
+    def _classify_prefetched_archives() -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+        """Walk the cachi2 output once and guess the mimetype of each file only once
 
-    def _find_prefetch_srpm_archives():
+        :return: a 2-elements tuple of the source archives and the SRPMs found, each
+            one is a list of (root, filename).
+        """
         guess_mime = filetype.guess_mime
+        source_archives, srpm_archives = [], []
         for root, dirs, files in os.walk(cachi2_output_dir):
             dirs.sort()
             for filename in sorted(files):
-                if filename.endswith(".src.rpm"):
-                    mimetype = guess_mime(os.path.join(root, filename))
-                    if mimetype and mimetype == "application/x-rpm":
-                        yield root, filename
+                mimetype = guess_mime(os.path.join(root, filename))
+                if not mimetype:
+                    continue
+                if mimetype in ARCHIVE_MIMETYPES:
+                    source_archives.append((root, filename))
+                elif filename.endswith(".src.rpm") and mimetype == "application/x-rpm":
+                    srpm_archives.append((root, filename))
+        return source_archives, srpm_archives
+
+    source_archives, srpm_archives = _classify_prefetched_archives()
 
     source_counter = itertools.count()
     prepared_sources_dir = create_dir(work_dir, "prefetched_sources")
     relative_to = os.path.relpath
 
-    for root, filename in _find_prefetch_source_archives():
+    for root, filename in source_archives:
         src_dir = f"src-{next(source_counter)}"
         copy_dest_dir = f"{prepared_sources_dir}/{src_dir}/{relative_to(root, cachi2_output_dir)}"
         os.makedirs(copy_dest_dir)
@@ -277,7 +284,7 @@ def gather_prefetched_sources(
 
     sib_dirs.rpm_dir = create_dir(work_dir, "bsi_rpms_dir")
     srpm_counter = itertools.count()
-    for root, filename in _find_prefetch_srpm_archives():
+    for root, filename in srpm_archives:
         next(srpm_counter)
         src = os.path.join(root, filename)
         dest = os.path.join(sib_dirs.rpm_dir, filename)
@@ -457,7 +464,10 @@ def resolve_source_image(binary_image: str, registries_allow_list: list[str]) ->
     if is_local_image(binary_image):
         logger.info("Skip handling local image %s.", binary_image)
         return None
-    allowed = urlparse("docker://" + binary_image).netloc in registries_allow_list
+    # the registry is everything before the first "/", which is the netloc of the
+    # equivalent docker:// URL, so there is no need for a full URL parse
+    registry, _, _ = binary_image.partition("/")
+    allowed = registry in registries_allow_list
     if allowed:
         return resolve_source_image_by_version_release(binary_image)
     else:
@@ -471,11 +481,8 @@ def parse_image_name(image: str) -> tuple[str, str, str]:
     This does not aim to be a generic image name parser and just handle the
     base image names generated by the build-container task.
     """
-    name, tag, digest = "", "", ""
-    parts = image.split("@")
-    name = parts[0]
-    if len(parts) > 1:
-        digest = parts[1]
+    tag = ""
+    name, _, digest = image.partition("@")
     parts = name.rsplit(":", 1)
     name = parts[0]
     if len(parts) > 1:
@@ -729,8 +736,14 @@ class Manifest(JSONBlob):
             self.to_python["config"] = new_config.descriptor
 
         layer_descriptors: list[DescriptorT] = self.to_python["layers"]
+        # Index the layers by digest once rather than scanning the descriptors
+        # for every layer. The first occurrence wins, as in _find_layer.
+        layer_indexes: dict[str, int] = {}
+        for idx, descriptor in enumerate(layer_descriptors):
+            layer_indexes.setdefault(descriptor["digest"], idx)
+
         for layer in self.layers:
-            idx = self._find_layer(layer)
+            idx = layer_indexes.get(layer.descriptor["digest"], -1)
             if idx < 0:
                 # deleted already, do nothing.
                 continue
@@ -842,11 +855,10 @@ class BSILayer:
         Example arcname: ./extra_src_dir/extra-src-100.tar
         """
         dirname, basename = os.path.split(member.name)
-        regex: Final = r"^extra-src-[0-9a-f]+\.tar$"
         return (
             member.issym()
             and dirname == "./extra_src_dir"
-            and re.match(regex, basename) is not None
+            and BSI_EXTRA_SRC_REGEX.match(basename) is not None
         )
 
     @staticmethod
@@ -860,8 +872,7 @@ class BSILayer:
 
     def _is_blob_file(self, member: TarInfo) -> bool:
         """Check if an archive member is a blob file"""
-        regex: Final = r"\./blobs/sha256/[0-9a-f]+"
-        return member.isreg() and re.fullmatch(regex, member.name) is not None
+        return member.isreg() and BSI_BLOB_FILE_REGEX.fullmatch(member.name) is not None
 
     def _extract(self) -> None:
         """Extract symlink and blob members"""
@@ -947,14 +958,13 @@ def merge_image(parent_sources_dir: str, local_source_build: str) -> None:
     parent_image_config = parent_image_manifest.config
     local_build_config = local_build_manifest.config
 
-    for diff_id in reversed(parent_image_config.diff_ids):
-        local_build_config.diff_ids.insert(0, diff_id)
+    # prepend in a single slice assignment rather than one insert(0, ...) per item
+    local_build_config.diff_ids[0:0] = parent_image_config.diff_ids
 
     n = len(parent_image_config.diff_ids)
     logger.debug("write diff_ids into local source build:\n%r", local_build_config.diff_ids[0:n])
 
-    for history in reversed(parent_image_config.history):
-        local_build_config.history.insert(0, history)
+    local_build_config.history[0:0] = parent_image_config.history
 
     n = len(parent_image_config.history)
     logger.debug("write history into local source build:\n%r", local_build_config.history[0:n])